@@ -8,6 +8,9 @@ import inspect
 import os
 import hashlib
 import contextlib
+import logging
+import logging.handlers
+import queue
 
 from pathlib import Path
 from typing import Tuple, Callable, Awaitable
@@ -49,6 +52,7 @@ async def on_button(name: str, edge: str) -> None:
         await evt_q.put((name, edge, t_in))
 
 DISPATCH_TIMEOUT_MS = 300
+_LOG = logging.getLogger("pihub.app")  # queued: see setup_logging()
 LOG_EVERY = int(os.getenv("PIHUB_LOG_EVERY", "0"))  # 0 disables sampling
 
 # inject the handler (no global `dispatcher` here)
@@ -64,14 +68,32 @@ async def ble_sender_worker(handle_fn: Callable[[str, str], Awaitable | None]) -
                 count += 1
                 if count % LOG_EVERY == 0:
                     t_out = time.monotonic_ns()
-                    print(f"[lat] {name}/{edge}: {(t_out - t_in)/1000:.1f} µs")
+                    _LOG.info("[lat] %s/%s: %.1f µs", name, edge, (t_out - t_in) / 1000)
         except asyncio.TimeoutError:
-            print(f"[dispatch] timeout {name}/{edge} after {DISPATCH_TIMEOUT_MS} ms")
+            _LOG.warning("[dispatch] timeout %s/%s after %d ms", name, edge, DISPATCH_TIMEOUT_MS)
         except Exception as e:
-            print(f"[dispatch] error {name}/{edge}: {e}")
+            _LOG.error("[dispatch] error %s/%s: %s", name, edge, e)
         finally:
             evt_q.task_done()
 
+def setup_logging() -> logging.handlers.QueueListener:
+    # Records are queued by the emitting thread (incl. paho's network thread)
+    # and written to stdout by one listener thread; messages carry their own
+    # "[tag]" prefix, so no extra formatting
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    out = logging.StreamHandler(sys.stdout)
+    out.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(q, out, respect_handler_level=True)
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(q)]
+    name = os.getenv("PIHUB_LOG_LEVEL", "INFO").strip().upper()
+    level = logging.getLevelName(name)  # int for known names, a string otherwise
+    root.setLevel(level if isinstance(level, int) else logging.INFO)
+    listener.start()
+    if not isinstance(level, int):
+        root.warning("[app] unknown PIHUB_LOG_LEVEL=%r → using INFO", name)
+    return listener
+
 async def main():
     # ── 1) Room config ──────────────────────────────────────────────────────────
     room_path = CONFIG_DIR / "room.yaml"
@@ -137,6 +159,9 @@ async def main():
         async def consumer_tap(self, *_args, **_kw):
             # no-op placeholder until BLE HID consumer support is wired up
             pass
+        async def consumer_sequence(self, *_args, **_kw):
+            # no-op placeholder: macros run against the real HIDClient only
+            pass
 
     dispatcher = Dispatcher(
         hid_client=NoopHID(),
@@ -249,7 +274,6 @@ async def main():
             stop_event=stop_ev,
             msc_only=False,     # keep KEY fast-path; MSC fallback for 9 codes
             debug_unmapped=False,
-            debug_trace=False,
         ),
         name="read_events",
     )
@@ -304,7 +328,10 @@ if __name__ == "__main__":
     except Exception:
         pass
 
+    log_listener = setup_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
+    finally:
+        log_listener.stop()  # flush queued records
\ No newline at end of file
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import asyncio
-import contextlib
 from typing import Optional, Set, Iterable
 
 
@@ -15,6 +14,26 @@ CONSUMER_REPEAT_MS: int = 150
 CONSUMER_TAP_MS: int = 40
 KEYBOARD_TAP_MS: int = 40
 
+# effective repeat cadence (60 ms floor), resolved once at import
+_CC_REPEAT_S: float = max(60, CONSUMER_REPEAT_MS) / 1000.0
+
+
+# usage → 2-byte little-endian Consumer report; the set of usages is small
+_CC_REPORTS: dict[int, bytes] = {}
+
+
+def _cc_report(usage: int) -> bytes:
+    rpt = _CC_REPORTS.get(usage)
+    if rpt is None:
+        rpt = _CC_REPORTS[usage] = usage.to_bytes(2, "little")
+    return rpt
+
+
+async def _sleep_until(loop: asyncio.AbstractEventLoop, deadline: float) -> None:
+    delay = deadline - loop.time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
 
 class HidDevice:
     """BLE GATT backend contract (implemented elsewhere)."""
@@ -84,6 +103,21 @@ class HIDClient:
         await asyncio.sleep(max(0, hold_ms) / 1000)
         await self.consumer_up()
 
+    async def consumer_sequence(self, steps: Iterable[tuple[int, int]], ikd_ms: int = 0) -> None:
+        """Tap each (usage, hold_ms) in order, ikd_ms apart (release → next press).
+        Edges run off absolute loop deadlines so waits don't drift."""
+        loop = asyncio.get_running_loop()
+        gap = max(0, ikd_ms) / 1000
+        t = loop.time()
+        for i, (usage, hold_ms) in enumerate(steps):
+            if i:
+                t += gap
+                await _sleep_until(loop, t)
+            await self.consumer_down(usage)
+            t += max(0, hold_ms) / 1000
+            await _sleep_until(loop, t)
+            await self.consumer_up()
+
     # ---------------- Builders & senders ------------------------------------
 
     def _kb_build(self) -> bytes:
@@ -108,8 +142,7 @@ class HIDClient:
             pass
 
     def _cc_build(self) -> bytes:
-        u = self._cc_usage
-        return bytes((u & 0xFF, (u >> 8) & 0xFF))
+        return _cc_report(self._cc_usage)
 
     def _cc_send(self) -> None:
         payload = self._cc_build()
@@ -125,20 +158,19 @@ class HIDClient:
 
     async def _start_cc_repeat(self) -> None:
         await self._stop_cc_repeat()
-        interval = max(60, CONSUMER_REPEAT_MS) / 1000.0
+        interval = _CC_REPEAT_S
 
         async def loop():
-            import time
             try:
+                clock = asyncio.get_running_loop().time
                 # Delay first tick so we don't duplicate the initial DOWN
-                next_at = time.monotonic() + interval
+                next_at = clock() + interval
                 while self._cc_usage:
-                    now = time.monotonic()
-                    delay = next_at - now
+                    delay = next_at - clock()
                     if delay > 0:
                         await asyncio.sleep(delay)
                     # Force a notify each tick with the same DOWN payload
-                    payload = bytes((self._cc_usage & 0xFF, (self._cc_usage >> 8) & 0xFF))
+                    payload = _cc_report(self._cc_usage)
                     try:
                         self.dev.send_consumer(payload)
                     except Exception:
@@ -154,8 +186,10 @@ class HIDClient:
         if task:
             self._cc_repeat_task = None
             task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
+            try:
                 await task
+            except asyncio.CancelledError:
+                pass
 
     # ---------------- Cleanup ------------------------------------------------
 
@@ -3,7 +3,6 @@ import asyncio
 import sys
 import os
 import time
-import yaml
 import contextlib
 import inspect
 
@@ -19,6 +18,8 @@ from dbus_fast import Variant
 
 from dataclasses import dataclass
 
+from pihub.core._yamlio import load_yaml
+
 # --------------------------
 # Device identity / advert
 # --------------------------
@@ -201,7 +202,6 @@ async def wait_for_any_connection(bus, poll_interval=0.25):
 
 async def wait_until_services_resolved(bus, device_path, timeout_s=30, poll_interval=0.25):
     """Wait for Device1.ServicesResolved == True for this device."""
-    import time
     deadline = time.time() + timeout_s
     while time.time() < deadline:
         objs = await _get_managed_objects(bus)
@@ -244,7 +244,6 @@ async def watch_link(bus, advert, hid: "HIDService"):
     Gate _link_ready when client actually enables notifications on any HID input.
     Also: unregister adverts on connect; re-register on disconnect.
     """
-    import time, contextlib
     while True:
         dev_path = await wait_for_any_connection(bus)
         with contextlib.suppress(Exception):
@@ -455,10 +454,6 @@ async def start_hid(config) -> tuple[HidRuntime, callable]:
     - config.device_name   : BLE local name (string)
     - config.appearance    : GAP appearance (int, default 0x03C1)
     """
-    from bluez_peripheral.util import get_message_bus, Adapter, is_bluez_available
-    from bluez_peripheral.advert import Advertisement
-    from bluez_peripheral.agent import NoIoAgent
-
     device_name = getattr(config, "device_name", None) or os.uname().nodename
     appearance  = int(getattr(config, "appearance", 0x03C1))  # keyboard
 
@@ -585,8 +580,7 @@ def _merge_keymaps(kb_map, cc_usages):
 def load_keymap_file(path=KEYMAP_PATH):
     global NAME_TO_KEY, NAME_TO_CC_USAGE
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        data = load_yaml(path)
         kb = data.get("keyboard", {}) or {}
         # prefer consumer_usages; fall back to legacy consumer_bits if present
         cc_u = data.get("consumer_usages", {}) or {}
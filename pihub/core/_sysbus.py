@@ -0,0 +1,26 @@
+# pihub/core/_sysbus.py
+from __future__ import annotations
+
+import asyncio
+
+from dbus_fast import BusType
+from dbus_fast.aio import MessageBus
+
+# One system-bus connection for the whole app (stats + BLE macros); bound to
+# the loop that opened it, so only call from the app loop
+_bus: MessageBus | None = None
+_lock: asyncio.Lock | None = None
+
+
+async def system_bus() -> MessageBus:
+    """Shared system-bus connection, opened lazily and reopened if it dropped.
+    Callers must not disconnect() it; process exit closes the socket."""
+    global _bus, _lock
+    if _bus is not None and _bus.connected:
+        return _bus
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _bus is None or not _bus.connected:
+            _bus = await MessageBus(bus_type=BusType.SYSTEM).connect()
+    return _bus
@@ -0,0 +1,33 @@
+# pihub/core/_yamlio.py
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import yaml
+
+# libyaml-backed loader when PyYAML was built with it; pure-Python otherwise
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _SafeLoader
+
+# path → ((mtime_ns, size), parsed data)
+_cache: dict[str, tuple[tuple[int, int], Any]] = {}
+
+
+def load_yaml(path: str) -> Any:
+    """Parse a YAML file, reusing the last result while mtime/size are unchanged.
+    The returned object is shared between callers: treat it as read-only."""
+    path = str(path)
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+
+    # binary mode: libyaml decodes UTF-8 itself, no TextIOWrapper pass
+    with open(path, "rb") as f:
+        data = yaml.load(f, Loader=_SafeLoader) or {}
+    _cache[path] = (key, data)
+    return data
@@ -1,6 +1,8 @@
 # pihub/core/config.py
 from dataclasses import dataclass
 
+from pihub.core._yamlio import load_yaml
+
 @dataclass
 class RoomConfig:
     room: str | None
@@ -15,9 +17,7 @@ class RoomConfig:
     bt_device_name: str | None = None
 
 def load_room_config(path: str) -> RoomConfig:
-    import yaml
-    with open(path, "r", encoding="utf-8") as f:
-        y = yaml.safe_load(f) or {}
+    y = load_yaml(path)
 
     mqtt = y.get("mqtt") or {}
     bt   = y.get("bt") or {}
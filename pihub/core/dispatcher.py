@@ -1,15 +1,30 @@
 import os
 import asyncio
-import yaml
 from dataclasses import dataclass
 from typing import Callable, Dict, Any, Optional
 
-from pihub.macros import atv as macros_atv
-from pihub.macros import sys as macros_sys
-from pihub.macros import ble as macros_ble
+from pihub.core._yamlio import load_yaml
+
+# Macros are optional: keep the dispatcher importable when a macro module (or
+# its deps, e.g. dbus-fast for ble) is missing on this box.
+try:
+    from pihub.macros import atv as macros_atv
+except ImportError:
+    macros_atv = None
+try:
+    from pihub.macros import sys as macros_sys
+except ImportError:
+    macros_sys = None
+try:
+    from pihub.macros import ble as macros_ble
+except ImportError:
+    macros_ble = None
 
 DEBUG_DISPATCH = False
 
+# accepted edge spellings → canonical edge
+_EDGES = {"press": "down", "down": "down", "release": "up", "up": "up"}
+
 # -----------------
 # Activities model
 # -----------------
@@ -19,8 +34,7 @@ class Activities:
     activities: Dict[str, Any]
 
 def load_activities(path: str) -> Activities:
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    data = load_yaml(path)
     default = (data.get("defaults") or {}).get("activity", "watch")
     return Activities(default=default, activities=data.get("activities") or {})
 
@@ -120,20 +134,23 @@ class Dispatcher:
             print("[dispatcher→mqtt] cmd:rx - payload empty!")
             return
     
-        parts = cmd.split(":", 1)
-        if len(parts) != 2:
+        cat, sep, action = cmd.partition(":")
+        if not sep:
             print(f"[dispatcher→mqtt] cmd:rx - bad format (expected 'cat:action'): {cmd!r}")
             return
-    
-        cat, action = parts[0].strip().lower(), parts[1].strip().lower()
+
+        cat, action = cat.strip().lower(), action.strip().lower()
     
         # --------- category: macro (BLE key macros) ---------
         if cat == "macro":
             if DEBUG_DISPATCH: print(f'[dispatcher→mqtt] cmd:rx - "{cat}:{action}"')
+            if macros_atv is None:
+                print(f"[dispatcher→mqtt] cmd:rx - macros unavailable: {cmd!r}")
+                return
         
             if action == "atv-on":
                 if DEBUG_DISPATCH: print("[dispatcher] running macro atv-on…")
-                await macros_atv.atv_on(self.hid, ikd_ms=400)
+                await macros_atv.atv_on(self.hid)
                 if DEBUG_DISPATCH: print("[macros] atv-on done")
                 return
         
@@ -149,6 +166,9 @@ class Dispatcher:
         # --------- category: sys (service/system controls) ---------
         if cat == "sys":
             if DEBUG_DISPATCH: print(f'[dispatcher→mqtt] cmd:rx - "{cat}:{action}"')
+            if macros_sys is None:
+                print(f"[dispatcher→mqtt] cmd:rx - macros unavailable: {cmd!r}")
+                return
         
             if action == "restart-pihub":
                 if DEBUG_DISPATCH: print("[dispatcher] running sys restart-pihub…")
@@ -168,6 +188,9 @@ class Dispatcher:
         # --------- category: ble (Bluetooth maintenance) ---------
         if cat == "ble":
             if DEBUG_DISPATCH: print(f'[dispatcher→mqtt] cmd:rx - "{cat}:{action}"')
+            if macros_ble is None:
+                print(f"[dispatcher→mqtt] cmd:rx - macros unavailable: {cmd!r}")
+                return
         
             if action == "unpair-all":
                 if DEBUG_DISPATCH: print("[dispatcher] running ble unpair-all")
@@ -181,11 +204,8 @@ class Dispatcher:
     
     async def handle(self, logical_name: str, edge: str):
         # Normalize edge names early
-        if edge in ("press", "down"):
-            edge = "down"
-        elif edge in ("release", "up"):
-            edge = "up"
-        else:
+        edge = _EDGES.get(edge)
+        if edge is None:
             return  # ignore anything else
     
         act = self.activities.activities.get(self.activity, {})
@@ -287,7 +307,7 @@ class Dispatcher:
                 if edge == "down":
                     # fire once immediately (log it)
                     if DEBUG_DISPATCH: print(f"[dispatch→HA] {logical_name} {edge} -> {domain}.{service} {data}")
-                    await self.mqtt.publish_ha_service(domain, service, data)
+                    self.mqtt.publish_ha_service(domain, service, data)
                     # then start repeat timer (first repeat after initial_ms)
                     await self._start_repeat(
                         logical_name,
@@ -301,7 +321,7 @@ class Dispatcher:
                 when = a.get("when", "up")
                 if when == "both" or (when == edge):
                     if DEBUG_DISPATCH: print(f"[dispatch→HA] {logical_name} {edge} -> {domain}.{service} {data}")
-                    await self.mqtt.publish_ha_service(domain, service, data)
+                    self.mqtt.publish_ha_service(domain, service, data)
             return
             
         # 3) Publish a simple activity intent (Pi → HA)
@@ -314,7 +334,7 @@ class Dispatcher:
                 return
             target = (a.get("to") or a.get("name") or "").lower()
             if target in ("watch", "listen", "power_off"):
-                await self.mqtt.publish_activity_intent(target)
+                self.mqtt.publish_activity_intent(target)
                 if DEBUG_DISPATCH: print(f"[dispatch→HA] intent → {target}")
             else:
                 if DEBUG_DISPATCH: print(f"[Dispatch→HA] unknown activity intent: {target!r}")
@@ -330,17 +350,27 @@ class Dispatcher:
         if kind == "noop":
             return
 
-    async def _start_repeat(self, key: str, coro_factory, rep: dict):
+    async def _start_repeat(self, key: str, fn, rep: dict):
         if key in self._repeat_tasks:
             return
         initial = rep.get("initial_ms", 500) / 1000.0
         every   = rep.get("every_ms",   500) / 1000.0
 
         async def repeater():
-            await asyncio.sleep(initial)
-            while key in self._repeat_tasks:
-                await coro_factory()
-                await asyncio.sleep(every)
+            # Absolute deadlines: cadence doesn't drift by fn()/wake-up latency
+            loop = asyncio.get_running_loop()
+            next_t = loop.time() + initial
+            while True:
+                # Always yield, even when due (every_ms: 0): fn() is sync, and
+                # the "up" that stops us needs the loop to run
+                await asyncio.sleep(max(0.0, next_t - loop.time()))
+                if key not in self._repeat_tasks:
+                    break
+                fn()
+                next_t += every
+                # Fell a whole tick behind (loop stalled): resync, no catch-up burst
+                if next_t < loop.time():
+                    next_t = loop.time() + every
 
         t = asyncio.create_task(repeater(), name=f"repeat:{key}")
         self._repeat_tasks[key] = t
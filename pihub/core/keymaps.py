@@ -1,18 +1,15 @@
-import asyncio, os, time, yaml
+import asyncio, os, time
 from dataclasses import dataclass
 
-@dataclass(frozen=True)
+from pihub.core._yamlio import load_yaml
+
+@dataclass(frozen=True, slots=True)
 class Keymaps:
     keyboard: dict[str, int]
     consumer: dict[str, int]
 
-def _load_yaml(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    return data
-
 def load_keymaps(path: str) -> Keymaps:
-    data = _load_yaml(path)
+    data = load_yaml(path)
     kb = data.get("keyboard", {}) or {}
     cc = data.get("consumer_usages", {}) or {}
     # normalize keys to strings, values to ints
@@ -20,17 +17,21 @@ def load_keymaps(path: str) -> Keymaps:
     cc = {str(k): int(v) for k, v in cc.items()}
     return Keymaps(kb, cc)
 
-async def watch_keymaps(path: str, on_reload, *, poll=0.5):
-    """Call on_reload(Keymaps) when file mtime changes. Never throws."""
-    last_mtime = 0.0
+async def watch_keymaps(path: str, on_reload, *, poll=1.0):
+    """Call on_reload(Keymaps) when file mtime changes. Never throws.
+    stat + parse run in a worker thread so the event loop never stalls."""
+    last_mtime = 0
     km = None
+    last_km = None
     while True:
         try:
-            m = os.path.getmtime(path)
-            if m != last_mtime:
-                last_mtime = m
-                km = load_keymaps(path)
-                on_reload(km)
+            st = await asyncio.to_thread(os.stat, path)
+            if st.st_mtime_ns != last_mtime:
+                last_mtime = st.st_mtime_ns
+                km = await asyncio.to_thread(load_keymaps, path)
+                if km != last_km:  # touched but unchanged: no reload
+                    last_km = km
+                    on_reload(km)
         except FileNotFoundError:
             pass
         except Exception as e:
@@ -2,22 +2,56 @@
 from __future__ import annotations
 import asyncio
 import contextlib
+import errno
 import inspect
+import logging
+import os
+import random
+import struct
 from dataclasses import dataclass
-from typing import Callable, Optional, Dict
+from types import MappingProxyType
+from typing import Callable, Optional, Dict, Mapping
 
 from evdev import InputDevice, ecodes
 
-@dataclass
+from pihub.core._yamlio import load_yaml
+
+# Trace output goes through logging: %-args are only formatted when DEBUG is on
+_LOG = logging.getLogger("pihub.remote")
+
+# struct input_event: timeval (2 × long), type, code, value; native sizes so
+# 64-bit (24 B) and 32-bit (16 B) userspace both decode correctly
+_EV_STRUCT = struct.Struct("llHHi")
+_EV_SIZE = _EV_STRUCT.size
+_EV_READ = _EV_SIZE * 64
+
+@dataclass(slots=True)
 class RemoteConfig:
     path: str                     # /dev/input/by-id/...
-    mapping: Dict[str, str]       # scancode (string) -> logical name
+    key_map: Mapping[int, str]    # evdev KEY_* code -> logical name (read-only)
+    msc_map: Mapping[int, str]    # MSC scancode -> logical name (read-only)
     grab: bool = True             # exclusive grab
 
+def _parse_scancode(k) -> int | None:
+    """YAML int as-is; "0x…" or bare hex digits → base 16; otherwise base 10."""
+    if isinstance(k, bool):
+        return None
+    if isinstance(k, int):
+        return k
+    if not isinstance(k, str):
+        return None
+    t = k.strip().lower()
+    try:
+        if t.startswith("0x"):
+            return int(t, 16)
+        if t.isdigit():
+            return int(t, 10)
+        return int(t, 16)
+    except ValueError:
+        return None
+
 def load_remote_config(path: str) -> RemoteConfig:
-    import yaml
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    data = load_yaml(path)
 
     dev = data.get("device") or {}
     by_id = dev.get("by_id")
@@ -28,9 +62,33 @@ def load_remote_config(path: str) -> RemoteConfig:
     if not isinstance(raw_map, dict):
         raise ValueError("remote_keymap.yaml: mapping must be a dict")
 
-    mapping: Dict[str, str] = {str(k): str(v) for k, v in raw_map.items()}
+    # Two flat int-keyed tables so the reader does one lookup per event:
+    # KEY_* names resolve to ev.code via ecodes, everything else is an MSC scancode.
+    key_map: Dict[int, str] = {}
+    msc_map: Dict[int, str] = {}
+    bad: list[str] = []
+    for k, v in raw_map.items():
+        if isinstance(k, str) and k.startswith("KEY_"):
+            code = ecodes.ecodes.get(k)
+            if code is None:
+                bad.append(k)
+            else:
+                key_map[code] = str(v)
+            continue
+        code = _parse_scancode(k)
+        if code is None:
+            bad.append(str(k))
+        else:
+            msc_map[code] = str(v)
+    if bad:
+        print(f"[remote] ignoring unknown mapping keys: {', '.join(bad)}")
     grab = bool(data.get("grab", True))
-    return RemoteConfig(path=by_id, mapping=mapping, grab=grab)
+    return RemoteConfig(
+        path=by_id,
+        key_map=MappingProxyType(key_map),
+        msc_map=MappingProxyType(msc_map),
+        grab=grab,
+    )
 
 async def read_events_scancode(
     rcfg: RemoteConfig,
@@ -40,15 +98,11 @@ async def read_events_scancode(
     *,
     msc_only: bool = False,
     debug_unmapped: bool = False,
-    debug_trace: bool = False,
     on_disconnect: Optional[Callable[[], None]] = None,
     on_reconnect: Optional[Callable[[], None]] = None,
     log: Optional[Callable[[str], None]] = None,
 ):
     """MSC-scan-only reader with robust reopen + jittered backoff + breadcrumb logs."""
-    import asyncio, errno, random, contextlib
-    from evdev import InputDevice, ecodes
-
     if stop_event is None:
         stop_event = asyncio.Event()
     if log is None:
@@ -60,8 +114,34 @@ async def read_events_scancode(
     def jitter(s: float) -> float:
         return s * random.uniform(0.8, 1.2)
 
+    async def backoff_wait(s: float) -> None:
+        # Sleep, but wake immediately on shutdown
+        try:
+            await asyncio.wait_for(stop_event.wait(), jitter(s))
+        except asyncio.TimeoutError:
+            pass
+
     was_connected = False  # ← breadcrumb state
 
+    # on_button is fixed for the reader's lifetime: classify it once
+    # (iscoroutinefunction unwraps bound methods itself)
+    is_coro = inspect.iscoroutinefunction(on_button)
+
+    loop = asyncio.get_running_loop()
+
+    async def _dispatch(logical: str, edge: str) -> None:
+        # Awaited inline: edges reach on_button in order, and a slow handler
+        # backs up into the kernel queue (app's on_button only enqueues)
+        try:
+            if is_coro:
+                await on_button(logical, edge)
+            else:
+                res = on_button(logical, edge)
+                if res is not None and inspect.isawaitable(res):
+                    await res
+        except Exception as e:
+            log(f"[remote] on_button error for {logical}/{edge}: {e}")
+
     while not stop_event.is_set():
         dev = None
         try:
@@ -72,15 +152,13 @@ async def read_events_scancode(
                 try:
                     dev.grab()
                     grabbed = True
-                    if debug_trace:
-                        log(f"[remote] grabbed {rcfg.path}")
+                    _LOG.debug("[remote] grabbed %s", rcfg.path)
                 except PermissionError:
                     log("[remote] grab failed (permission). Add user to 'input' group or run with sudo.")
-                    await asyncio.sleep(jitter(min(backoff_max, 15.0)))
+                    await backoff_wait(min(backoff_max, 15.0))
                     continue
                 except OSError as e:
-                    if debug_trace:
-                        log(f"[remote] grab failed: {e}")
+                    _LOG.debug("[remote] grab failed: %s", e)
 
             # on successful open (and optional grab)
             if on_reconnect:
@@ -93,78 +171,129 @@ async def read_events_scancode(
             was_connected = True
             # ────────────────────────────────────────────────────────────────────
             
-            last_msc: str | None = None
+            # Per-frame state: reset on every SYN so a scan never leaks into a later frame
+            frame_msc: int | None = None
+            frame_keys: list[tuple[int, int]] = []
+            # Logical keys we've reported down; released by hand after SYN_DROPPED
+            held: set[str] = set()
+            dropping = False  # after SYN_DROPPED: skip up to and incl. the next SYN_REPORT
             backoff = max(0.2, float(retry_backoff))  # reset after success
+
+            # Hot-loop locals: avoid module attribute loads per event
+            _EV_MSC = ecodes.EV_MSC
+            _MSC_SCAN = ecodes.MSC_SCAN
+            _EV_KEY = ecodes.EV_KEY
+            _EV_SYN = ecodes.EV_SYN
+            _SYN_REPORT = ecodes.SYN_REPORT
+            _SYN_DROPPED = ecodes.SYN_DROPPED
+            _key_get = rcfg.key_map.get
+            _KEY_get = ecodes.KEY.get
+            _msc_get = rcfg.msc_map.get
+            _ev_iter = _EV_STRUCT.iter_unpack
             
-            async for ev in dev.async_read_loop():
-                if stop_event.is_set():
-                    break
-            
-                # Track latest MSC (identity only; do not gate on it)
-                if ev.type == ecodes.EV_MSC and ev.code == ecodes.MSC_SCAN:
-                    v = str(ev.value)
-                    if debug_trace and v != last_msc:
-                        log(f"[remote:trace] MSC_SCAN={v}")
-                    last_msc = v
-                    continue
-            
-                # Only act on key events
-                if ev.type != ecodes.EV_KEY:
-                    if debug_trace:
-                        log(f"[remote:trace] type={ev.type} code={ev.code} val={ev.value}")
-                    continue
-            
-                # Edge
-                if ev.value == 1:
-                    edge = "down"
-                elif ev.value == 0:
-                    edge = "up"
-                else:
-                    if debug_trace:
-                        log(f"[remote:trace] KEY repeat ignored (val=2)")
-                    continue
-            
-                # === NEW: prefer KEY_* fast path; fallback to MSC ===
-                logical = None
-            
-                # 1) KEY_* → logical (fast path) when not gating on MSC
-                key_name = ecodes.KEY[ev.code] if ev.code in ecodes.KEY else None
-                if not msc_only and key_name:
-                    logical = rcfg.mapping.get(key_name)
-            
-                # 2) MSC fallback (handles hex or decimal; YAML may store int or str)
-                if logical is None and last_msc:
-                    s = str(last_msc)
-                    msc_int = None
+            # Raw reads: one os.read per wakeup takes the whole burst
+            # (MSC+KEY+SYN) without building an InputEvent per record
+            fd = dev.fd
+            os.set_blocking(fd, False)
+            readable = asyncio.Event()
+            rbuf = bytearray(_EV_READ)  # reused scratch buffer, filled in place
+            rbufs = [rbuf]
+            rview = memoryview(rbuf)
+            loop.add_reader(fd, readable.set)
+            drained = True
+            try:
+                while not stop_event.is_set():
+                    # Drain to EAGAIN before sleeping again: one wakeup per burst
+                    if drained:
+                        await readable.wait()
+                        readable.clear()
                     try:
-                        # try hex first (e.g., 'c01ec'), then decimal
-                        msc_int = int(s, 16)
-                    except Exception:
-                        try:
-                            msc_int = int(s, 10)
-                        except Exception:
-                            msc_int = None
-            
-                    if msc_int is not None:
-                        logical = rcfg.mapping.get(msc_int) or rcfg.mapping.get(str(msc_int))
-                    if logical is None:
-                        # last resort: raw string key
-                        logical = rcfg.mapping.get(last_msc)
-            
-                # 3) Drop if still unmapped
-                if not logical:
-                    if debug_unmapped:
-                        log(f"[remote] unmapped scan '{last_msc or ev.code}' (edge={edge})")
-                    continue
-            
-                # 4) Dispatch (await if coroutine)
-                try:
-                    res = on_button(logical, edge)
-                    if asyncio.iscoroutine(res):
-                        await res
-                except Exception as e:
-                    log(f"[remote] on_button error for {logical}/{edge}: {e}")
-            
+                        n = os.readv(fd, rbufs)
+                    except BlockingIOError:
+                        drained = True
+                        continue
+                    if not n:
+                        break
+                    # short read: kernel queue is empty; full read: more pending
+                    drained = n < _EV_READ
+
+                    # iter_unpack walks the records in C over a zero-copy view
+                    for _sec, _usec, ev_type, ev_code, ev_value in _ev_iter(rview[:n - n % _EV_SIZE]):
+                        # Collect one frame (… SYN_REPORT), then dispatch its key edges
+                        if dropping:
+                            if ev_type == _EV_SYN and ev_code == _SYN_REPORT:
+                                dropping = False
+                            continue
+
+                        if ev_type == _EV_MSC:
+                            if ev_code == _MSC_SCAN:
+                                frame_msc = ev_value
+                            continue
+
+                        if ev_type == _EV_KEY:
+                            if ev_value == 2:
+                                _LOG.debug("[remote:trace] KEY repeat ignored (val=2)")
+                            else:
+                                frame_keys.append((ev_code, ev_value))
+                            continue
+
+                        if ev_type != _EV_SYN:
+                            _LOG.debug("[remote:trace] type=%s code=%s val=%s", ev_type, ev_code, ev_value)
+                            continue
+
+                        if ev_code == _SYN_DROPPED:
+                            # Kernel buffer overran: this frame and everything up to the
+                            # next SYN_REPORT is unreliable, and a lost "up" would leave a
+                            # hold/repeat running; release whatever we reported as down
+                            frame_msc = None
+                            frame_keys.clear()
+                            dropping = True
+                            _LOG.warning("[remote] SYN_DROPPED: releasing %d held key(s)", len(held))
+                            for logical in held:
+                                await _dispatch(logical, "up")
+                            held.clear()
+                            continue
+                        if ev_code != _SYN_REPORT:
+                            continue  # SYN_CONFIG / SYN_MT_REPORT: not a frame boundary
+
+                        msc = frame_msc
+                        frame_msc = None
+                        if not frame_keys:
+                            continue  # MSC/axis-only frame: nothing to dispatch
+                        _LOG.debug("[remote:trace] MSC_SCAN=%s", msc)
+
+                        for code, value in frame_keys:
+                            edge = "down" if value == 1 else "up"
+                            logical = None
+
+                            # 1) KEY code → logical (fast path) when not gating on MSC
+                            if not msc_only:
+                                logical = _key_get(code)
+
+                            # 2) MSC fallback (same frame only; never a stale scan)
+                            if logical is None and msc is not None:
+                                logical = _msc_get(msc)
+
+                            # 3) Drop if still unmapped
+                            if not logical:
+                                if debug_unmapped:
+                                    # one .get; some codes map to a list of alias names
+                                    key_name = _KEY_get(code)
+                                    if isinstance(key_name, (list, tuple)):
+                                        key_name = key_name[0]
+                                    log(f"[remote] unmapped scan '{msc if msc is not None else code}' key={key_name} (edge={edge})")
+                                continue
+
+                            # 4) Dispatch
+                            if value:
+                                held.add(logical)
+                            else:
+                                held.discard(logical)
+                            await _dispatch(logical, edge)
+                        frame_keys.clear()
+            finally:
+                loop.remove_reader(fd)
+
             # If we ever fall out of the loop, treat as disconnect
             raise OSError(errno.ENODEV, "device read loop ended")
 
@@ -177,9 +306,8 @@ async def read_events_scancode(
                 log("[remote] usb receiver disconnected; reopening…")
             was_connected = False
             # ────────────────────────────────────────────────────────────────────
-            if debug_trace:
-                log(f"[remote] {rcfg.path} not found; retrying…")
-            await asyncio.sleep(jitter(backoff))
+            _LOG.debug("[remote] %s not found; retrying…", rcfg.path)
+            await backoff_wait(backoff)
             backoff = min(backoff_max, backoff * 1.7)
             continue
 
@@ -192,15 +320,14 @@ async def read_events_scancode(
                 log("[remote] usb receiver disconnected; reopening…")
             was_connected = False
             # ────────────────────────────────────────────────────────────────────
-            if debug_trace:
-                log(f"[remote] OSError: {e}; reopening after backoff…")
-            await asyncio.sleep(jitter(backoff))
+            _LOG.debug("[remote] OSError: %s; reopening after backoff…", e)
+            await backoff_wait(backoff)
             backoff = min(backoff_max, backoff * 1.7)
             continue
 
         except Exception as e:
             log(f"[remote] unexpected error: {e}; reopening…")
-            await asyncio.sleep(jitter(backoff))
+            await backoff_wait(backoff)
             backoff = min(backoff_max, backoff * 1.7)
             continue
 
@@ -0,0 +1,23 @@
+# pihub/ha_mqtt/_jsonio.py
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# orjson when installed (compact UTF-8 bytes straight from C); stdlib otherwise
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+if orjson is not None:
+    _OPTS = orjson.OPT_NON_STR_KEYS  # match json.dumps: int keys become strings
+
+    def dumps(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes, ready to hand to client.publish()."""
+        return orjson.dumps(obj, option=_OPTS)
+else:
+    def dumps(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes, ready to hand to client.publish()."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import logging
 import threading
 import random
 import os
@@ -17,9 +17,31 @@ import paho.mqtt.client as mqtt
 from .mqtt_config import MqttConfig as CoreCfg  # internal config for topics/client_id
 from .mqtt_topics import build_topics
 from .mqtt_publishers import publish_discovery, clear_retained_at_start
-from .mqtt_stats_pi import get_stats
+from .mqtt_stats_pi import CpuSampler, get_stats, invalidate_primary_ip
+from ._jsonio import dumps as _dumps
+
+_NO_DATA: dict = {}  # shared "data" for calls without args; never mutated
+
+# Availability payloads as bytes: paho passes bytes through unencoded
+_ONLINE = b"online"
+_OFFLINE = b"offline"
+
+# Logged, not printed: most of this runs on paho's network thread, and the
+# app's QueueHandler keeps stdout writes off it. TX/RX traces are DEBUG;
+# %-args are formatted only when a record is actually emitted
+_LOG = logging.getLogger("pihub.mqtt")
+
+
+def _decode(p: bytes | None) -> str:
+    # Payloads are short ASCII in practice ("watch", "macro:atv-on"); the strict
+    # ASCII codec skips error-handler setup, UTF-8 w/ replace is the fallback
+    if not p:
+        return ""
+    try:
+        return p.decode("ascii")
+    except UnicodeDecodeError:
+        return p.decode("utf-8", "replace")
 
-DEBUG_MQTT = False
 
 @dataclass
 class MqttConfig:
@@ -70,6 +92,23 @@ class MqttBridge:
         self._topics = build_topics(self._core.prefix_bridge, self._core.room)
         # Your log prints this at startup:
         self.topic_activity_state = f"pihub/input_select/{cfg.input_select_entity}/state"
+        # Topics resolved once; hot paths use plain str attributes
+        self._topic_cmd = self._topics.cmd_all.topic
+        self._topic_status = self._topics.status.topic
+        self._topic_status_info = self._topics.status_info.topic
+        self._topic_activity = self._topics.activity.topic
+        self._topic_ha_service = self._topics.ha_service_call.topic
+        # (topic, qos) subscribed on every (re)connect
+        self._subs: tuple[tuple[str, int], ...] = (
+            (self.topic_activity_state, 1),
+            (self._topic_cmd, self._topics.cmd_all.qos),
+        )
+        self._subs_label = ", ".join(t for t, _ in self._subs)
+        # topic → handler(payload); new inbound topics register here
+        self._rx_handlers: dict[str, Callable[[bytes], None]] = {
+            self.topic_activity_state: self._rx_activity,
+            self._topic_cmd: self._rx_cmd,
+        }
 
         # paho client (persistent session)
         self.client = mqtt.Client(
@@ -83,14 +122,19 @@ class MqttBridge:
 
         # LWT: availability on /status (plain string, retained)
         self.client.will_set(
-            self._topics.status.topic,
-            payload="offline",
+            self._topic_status,
+            payload=_OFFLINE,
             qos=1,
             retain=True,
         )
 
         # Tuning
-        self.client.reconnect_delay_set(min_delay=1, max_delay=30)
+        # paho doubles the delay min→max without jitter; randomize the schedule
+        # per instance so hubs that dropped together don't reconnect in lockstep
+        self.client.reconnect_delay_set(
+            min_delay=random.uniform(0.5, 1.5),
+            max_delay=random.uniform(24.0, 36.0),
+        )
         self.client.max_inflight_messages_set(40)
         self.client.max_queued_messages_set(20)
         self.client.queue_qos0_messages = False
@@ -103,6 +147,7 @@ class MqttBridge:
 
         # Runner state
         self._status_task: Optional[asyncio.Task] = None
+        self._stats_once_task: Optional[asyncio.Task] = None
         self._stopping = asyncio.Event()
 
         # Activity provider callable (used by your app, if needed later)
@@ -110,6 +155,15 @@ class MqttBridge:
         
         self._subs_pending: dict[int, str] = {}  # mid → topic
 
+        # (domain, service) → encoded '{"domain":…,"service":…,"data":' prefix
+        self._svc_prefix_cache: dict[tuple[str, str], bytes] = {}
+        # raw activity arg → normalised payload bytes (b"" = nothing to send)
+        self._act_cache: dict[str, bytes] = {}
+
+        # Discovery is a pure function of (topics, room): build + encode once,
+        # replay the bytes on every (re)connect
+        self._discovery_msgs = self._build_discovery_messages()
+
     # --------------------- public API used by your app ---------------------
 
     async def start(self, activity_provider: Callable[[], str]) -> None:
@@ -136,53 +190,77 @@ class MqttBridge:
             with suppress(asyncio.CancelledError):
                 await self._status_task
             self._status_task = None
+        if self._stats_once_task:
+            self._stats_once_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._stats_once_task
+            self._stats_once_task = None
         
-        # Best-effort offline + disconnect
+        # Best-effort offline + disconnect; skipped when the broker is already
+        # gone, and the PUBACK wait is capped so shutdown can't stall
         try:
             if self.client.is_connected():
-                self.client.publish(
-                    self._topics.status.topic,
-                    "offline",
+                info = self.client.publish(
+                    self._topic_status,
+                    _OFFLINE,
                     qos=1,
                     retain=True,
                 )
+                await asyncio.to_thread(info.wait_for_publish, 1.5)
         except Exception:
             pass
         finally:
             with suppress(Exception):
                 self.client.disconnect()
-            with suppress(Exception):
-                self.client.loop_stop()
-
-    async def publish_json(self, topic: str, obj: dict) -> None:
+            # loop_stop() joins the network thread, which may be mid-connect to
+            # a dead broker. Run it on its own daemon thread, not the default
+            # executor: asyncio.run() joins executor workers at exit, a daemon
+            # thread we stop waiting for can't hold the process open
+            stopper = threading.Thread(target=self.client.loop_stop, name="mqtt-loop-stop", daemon=True)
+            stopper.start()
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 2.0
+            while stopper.is_alive() and loop.time() < deadline:
+                await asyncio.sleep(0.05)
+            if stopper.is_alive():
+                _LOG.warning("[mqtt] network thread still stopping; exiting without it")
+
+    # publish_* are plain methods: paho's publish() only queues, nothing to await
+    def publish_json(self, topic: str, obj: dict) -> None:
         """Generic JSON publish (QoS1, non-retained)."""
-        payload = json.dumps(obj, separators=(",", ":"))
-        self.client.publish(topic, payload, qos=1, retain=False)
-
-    async def publish_ha_service(self, domain: str, service: str, data: dict | None = None) -> None:
-        payload = {
-            "domain": str(domain),
-            "service": str(service),
-            "data": data or {},
-        }
-        js = json.dumps(payload, separators=(",", ":"))
-        if DEBUG_MQTT: print(f"[mqtt:tx] topic={self._topics.ha_service_call.topic} qos=1 retain=False payload={js}")
+        self.client.publish(topic, _dumps(obj), qos=1, retain=False)
+
+    def publish_ha_service(self, domain: str, service: str, data: dict | None = None) -> None:
+        # Only "data" is encoded per call; the outer shell is cached per service
+        key = (str(domain), str(service))
+        prefix = self._svc_prefix_cache.get(key)
+        if prefix is None:
+            prefix = (b'{"domain":' + _dumps(key[0]) + b',"service":' + _dumps(key[1]) + b',"data":')
+            self._svc_prefix_cache[key] = prefix
+        js = prefix + _dumps(data or _NO_DATA) + b"}"
+        _LOG.debug("[mqtt:tx] topic=%s qos=1 retain=False payload=%s", self._topic_ha_service, js)
         self._try_publish_or_drop(
-            self._topics.ha_service_call.topic,
-            js.encode(),
+            self._topic_ha_service,
+            js,
             qos=1,
             retain=False,
             kind="ha_service",
         )
     
-    async def publish_activity_intent(self, activity: str) -> None:
-        act = (activity or "").strip().lower()
-        if not act:
+    def publish_activity_intent(self, activity: str) -> None:
+        # Same handful of intents every time: normalise + encode once per input
+        payload = self._act_cache.get(activity)
+        if payload is None:
+            payload = (activity or "").strip().lower().encode()
+            if len(self._act_cache) >= 64:
+                self._act_cache.clear()
+            self._act_cache[activity] = payload
+        if not payload:
             return
-        if DEBUG_MQTT: print(f"[mqtt:tx] topic={self._topics.activity.topic} qos=1 retain=False payload={act}")
+        _LOG.debug("[mqtt:tx] topic=%s qos=1 retain=False payload=%s", self._topic_activity, payload)
         self._try_publish_or_drop(
-            self._topics.activity.topic,
-            act.encode(),
+            self._topic_activity,
+            payload,
             qos=1,
             retain=False,
             kind="activity",
@@ -196,21 +274,35 @@ class MqttBridge:
         if self.client.is_connected():
             self.client.publish(topic, payload, qos=qos, retain=retain)
             return
-        print(f"[mqtt] offline! dropped {kind} QoS{qos} -> {topic}")
+        _LOG.warning("[mqtt] offline! dropped %s QoS%d -> %s", kind, qos, topic)
 
 
     # -------------------------- internal helpers --------------------------
 
+    def _build_discovery_messages(self) -> list[tuple[str, bytes, int, bool]]:
+        """Run publish_discovery into a list; returns (topic, payload, qos, retain)."""
+        msgs: list[tuple[str, bytes, int, bool]] = []
+
+        def _capture(topic: str, payload: bytes, qos: int, retain: bool) -> None:
+            msgs.append((topic, payload, qos, retain))
+
+        try:
+            publish_discovery(_capture, self._topics, self._room)
+        except Exception as e:
+            _LOG.error("[mqtt] discovery build error: %r", e)
+        return msgs
+
     async def _status_heartbeat(self) -> None:
         """Immediate + periodic status publishes with real stats; drop when offline."""
         interval = max(5, int(self.cfg.status_interval_sec))
+        stats: dict = {}  # refilled in place each tick
+        cpu = CpuSampler()  # load over each heartbeat interval
         try:
             # Initial status (helper drops if offline)
             await asyncio.sleep(0.1)
-            stats = get_stats()
-            payload = json.dumps(stats, separators=(",", ":")).encode("utf-8")
+            payload = _dumps(await get_stats(stats, cpu))
             self._try_publish_or_drop(
-                self._topics.status_info.topic,
+                self._topic_status_info,
                 payload,
                 qos=0,
                 retain=False,
@@ -219,11 +311,16 @@ class MqttBridge:
     
             # Heartbeat
             while not self._stopping.is_set():
-                await asyncio.sleep(interval)
-                stats = get_stats()
-                payload = json.dumps(stats, separators=(",", ":")).encode("utf-8")
+                # Interval wait that also wakes on shutdown (no wait_for Task)
+                try:
+                    async with asyncio.timeout(interval):
+                        await self._stopping.wait()
+                    break
+                except TimeoutError:
+                    pass
+                payload = _dumps(await get_stats(stats, cpu))
                 self._try_publish_or_drop(
-                    self._topics.status_info.topic,
+                    self._topic_status_info,
                     payload,
                     qos=0,
                     retain=False,
@@ -234,79 +331,97 @@ class MqttBridge:
 
     # ----------------------------- callbacks ------------------------------
 
-    def _publish_stats_once(self) -> None:
-        # Why: guarantee a snapshot shortly after connect even if the first got dropped
-        stats = get_stats()
-        publish_status_bridge(self.client, self._topics.status_info.topic, stats)
+    async def _publish_stats_once(self) -> None:
+        # Why: snapshot right after connect, plus a ~0.5s refresh in case the first got dropped
+        # Own CPU baseline: doesn't disturb the heartbeat's interval
+        cpu = CpuSampler()
+        try:
+            publish_status_bridge(self.client, self._topic_status_info, await get_stats(cpu=cpu))
+            await asyncio.sleep(0.5)
+            publish_status_bridge(self.client, self._topic_status_info, await get_stats(cpu=cpu))
+        except Exception as e:
+            _LOG.error("[mqtt] status publish error: %r", e)
+
+    def _kick_stats(self) -> None:
+        # Runs on the app loop; keep a ref so the task isn't collected mid-flight.
+        # A reconnect supersedes the previous connect's snapshot.
+        if self._stopping.is_set():
+            return
+        if self._stats_once_task and not self._stats_once_task.done():
+            self._stats_once_task.cancel()
+        self._stats_once_task = asyncio.create_task(self._publish_stats_once(), name="mqtt_stats_once")
     
     def _on_connect(self, client: mqtt.Client, userdata, flags, rc, properties=None):
         sp = flags.get("session present") if isinstance(flags, dict) else flags
         session_present = bool(sp)
-        print(f"[mqtt] connected; session_present={session_present}")
-    
-        client.publish(self._topics.status.topic, "online", qos=1, retain=True)
+        _LOG.info("[mqtt] connected; session_present=%s", session_present)
     
-        rc1, mid1 = client.subscribe(self.topic_activity_state, qos=1)
-        if rc1 == mqtt.MQTT_ERR_SUCCESS:
-            self._subs_pending[mid1] = self.topic_activity_state
+        client.publish(self._topic_status, _ONLINE, qos=1, retain=True)
     
-        rc2, mid2 = client.subscribe(self._topics.cmd_all.topic, qos=self._topics.cmd_all.qos)
-        if rc2 == mqtt.MQTT_ERR_SUCCESS:
-            self._subs_pending[mid2] = self._topics.cmd_all.topic
+        # One SUBSCRIBE packet (and one SUBACK) for every topic
+        rc, mid = client.subscribe(list(self._subs))
+        if rc == mqtt.MQTT_ERR_SUCCESS:
+            self._subs_pending[mid] = self._subs_label
     
         if not session_present:
-            clear_retained_at_start_bridge(client, self._topics)
-    
-        publish_discovery_bridge(client, self._topics, self._room)
+            try:
+                clear_retained_at_start(client.publish, self._topics)
+            except Exception:
+                pass
     
-        # Immediate stats snapshot
-        stats = get_stats()
-        publish_status_bridge(client, self._topics.status_info.topic, stats)
+        try:
+            for topic, payload, qos, retain in self._discovery_msgs:
+                client.publish(topic, payload, qos=qos, retain=retain)
+        except Exception as e:
+            _LOG.error("[mqtt] discovery publish error: %r", e)
     
-        # One-shot delayed refresh (~0.5s) to avoid any race
+        # A reconnect often means the network changed: re-probe the IP
+        invalidate_primary_ip()
+
+        # Stats snapshot + delayed refresh; get_stats is async, so hand off to
+        # the app loop (captured in start()) from this paho thread
         try:
-            # self._loop was captured in start(); schedule on the app loop
-            self._loop.call_later(0.5, self._publish_stats_once)
+            self._loop.call_soon_threadsafe(self._kick_stats)
         except Exception:
             # If loop not available, ignore; heartbeat will cover it
             pass
 
     def _on_disconnect(self, client: mqtt.Client, userdata, rc, properties=None):
         if rc != 0:
-            print(f"[mqtt] disconnected unexpectedly rc={rc}; retrying")
+            _LOG.warning("[mqtt] disconnected unexpectedly rc=%s; retrying", rc)
 
     def _on_subscribe(self, client, userdata, mid, granted_qos, properties=None):
         topic = self._subs_pending.pop(mid, None)
         if topic:
-            print(f"[mqtt] subscribed → {topic}")
+            _LOG.info("[mqtt] subscribed → %s", topic)
         else:
             # Fallback if mid not tracked (wildcards/multi-subs or broker-side resub)
-            print(f"[mqtt] subscribed mid={mid} qos={granted_qos}")
+            _LOG.info("[mqtt] subscribed mid=%s qos=%s", mid, granted_qos)
 
     def _on_message(self, client: mqtt.Client, userdata, msg: mqtt.MQTTMessage):
         t = msg.topic
         p = msg.payload
-    
+        _LOG.debug("[mqtt:rx] topic=%s payload=%s", t, p)
+        handler = self._rx_handlers.get(t)
+        if handler is not None:
+            handler(p)
+
+    def _rx_activity(self, p: bytes) -> None:
         # Activity statestream (HA → PiHub)
-        if t == self.topic_activity_state:
-            s = p.decode("utf-8", errors="replace") if p else ""
-            self._call_handler(self.on_activity_state, s)
-            return
-    
+        self._call_handler(self.on_activity_state, _decode(p))
+
+    def _rx_cmd(self, p: bytes) -> None:
         # Command bus (HA → PiHub): pihub/<room>/cmd with payload "category:action"
-        if t == self._topics.cmd_all.topic:
-            try:
-                cmd = (p or b"").decode("utf-8", "replace").strip()
-            except Exception:
-                cmd = ""
-            if cmd:
-                # on_command accepts a single string now (e.g. "macro:atv-on")
-                self._call_handler(self.on_command, cmd)
-            else:
-                print("[mqtt] cmd empty/invalid payload on command bus")
-            return
-                    
-                    
+        try:
+            cmd = _decode(p).strip()
+        except Exception:
+            cmd = ""
+        if cmd:
+            # on_command accepts a single string now (e.g. "macro:atv-on")
+            self._call_handler(self.on_command, cmd)
+        else:
+            _LOG.warning("[mqtt] cmd empty/invalid payload on command bus")
+
     def _call_handler(self, handler, *args) -> None:
         """Dispatch handler to the app's asyncio loop (never run in paho thread).
         - If handler returns a coroutine, create a task for it.
@@ -318,26 +433,15 @@ class MqttBridge:
     
         loop = self._loop
         if loop and loop.is_running():
-            def _runner():
-                try:
-                    res = handler(*args)
-                    # Already a Task/Future? It's scheduled or will be awaited elsewhere.
-                    if isinstance(res, (asyncio.Task, asyncio.Future)):
-                        return
-                    # Bare coroutine: turn it into a Task on this loop.
-                    if asyncio.iscoroutine(res):
-                        asyncio.create_task(res)
-                except Exception as e:
-                    print(f"[mqtt] handler error (in loop): {e!r}")
-    
             try:
-                loop.call_soon_threadsafe(_runner)
+                # Bound method + args: no per-message closure
+                loop.call_soon_threadsafe(self._run_handler, handler, args)
             except Exception as e:
-                print(f"[mqtt] handler schedule error: {e!r}")
+                _LOG.error("[mqtt] handler schedule error: %r", e)
             return
     
         # Fallback: no loop captured yet (very early). Run sync or coroutine on a temp loop.
-        print("[mqtt] WARNING: app loop not set/running; executing handler on fallback loop")
+        _LOG.warning("[mqtt] app loop not set/running; executing handler on fallback loop")
         def _fallback():
             try:
                 res = handler(*args)
@@ -345,34 +449,24 @@ class MqttBridge:
                     asyncio.run(res)
                 # If it's a Task/Future here, we can't safely bind it to this temp loop; ignore.
             except Exception as e:
-                print(f"[mqtt] handler error (fallback): {e!r}")
+                _LOG.error("[mqtt] handler error (fallback): %r", e)
         threading.Thread(target=_fallback, name="mqtt-fallback", daemon=True).start()
 
+    @staticmethod
+    def _run_handler(handler, args: tuple) -> None:
+        # Runs on the app loop
+        try:
+            res = handler(*args)
+            # Already a Task/Future? It's scheduled or will be awaited elsewhere.
+            if isinstance(res, (asyncio.Task, asyncio.Future)):
+                return
+            # Bare coroutine: turn it into a Task on this loop.
+            if asyncio.iscoroutine(res):
+                asyncio.create_task(res)
+        except Exception as e:
+            _LOG.error("[mqtt] handler error (in loop): %r", e)
+
 # ---------------- inline bridges to avoid importing asyncio in publishers ----------------
 
 def publish_status_bridge(client: mqtt.Client, status_info_topic: str, stats_extra: dict) -> None:
-    client.publish(status_info_topic, json.dumps(stats_extra, separators=(",", ":")), qos=0, retain=False)
-
-def publish_discovery_bridge(client: mqtt.Client, topics, room: str) -> None:
-    # reuse the retained discovery we wrote in mqtt_publishers.py
-    # by calling into it once; doing it here means no coroutine in this file
-    try:
-        # Build a tiny stub that matches PahoMqttBridge.publish_json / publish_bytes
-        class _PubShim:
-            def __init__(self, cli: mqtt.Client): self.client = cli
-            def publish_json(self, topic: str, payload: dict, qos=0, retain=False):
-                self.client.publish(topic, json.dumps(payload, separators=(",", ":")), qos=qos, retain=retain)
-            def publish_bytes(self, topic: str, payload: bytes, qos=0, retain=False):
-                self.client.publish(topic, payload, qos=qos, retain=retain)
-
-        shim = _PubShim(client)
-        publish_discovery(shim, topics, room)
-    except Exception as e:
-        print(f"[mqtt] discovery publish error: {e!r}")
-
-def clear_retained_at_start_bridge(client: mqtt.Client, topics) -> None:
-    try:
-        client.publish(topics.activity.topic, b"", qos=1, retain=True)
-        client.publish(topics.ha_service_call.topic, b"", qos=1, retain=True)
-    except Exception:
-        pass
\ No newline at end of file
+    client.publish(status_info_topic, _dumps(stats_extra), qos=0, retain=False)
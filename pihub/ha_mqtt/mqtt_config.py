@@ -4,7 +4,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
-import yaml
+
+from pihub.core._yamlio import load_yaml
 
 
 @dataclass(frozen=True)
@@ -21,7 +22,7 @@ class MqttConfig:
 
 
 def load_config(path: str | Path) -> MqttConfig:
-    data = yaml.safe_load(Path(path).read_text())
+    data = load_yaml(path)
 
     room = str(data["room"]).strip()
     m = data["mqtt"]
@@ -4,8 +4,9 @@ from __future__ import annotations
 import platform
 import socket
 import time
-import json
-from typing import Any, Dict, TYPE_CHECKING
+from typing import Any, Callable, Dict, TYPE_CHECKING
+
+from ._jsonio import dumps as _dumps
 
 if TYPE_CHECKING:
     # type-only import to avoid circular import at runtime
@@ -15,16 +16,17 @@ def _room_pretty(room: str) -> str:
     return room.replace("_", " ").title()
 
 
-def clear_retained_at_start(bridge: Any, topics: "Topics") -> None:
+def clear_retained_at_start(publish: Callable[[str, bytes, int, bool], Any], topics: "Topics") -> None:
     """
     Force-nuke any accidental retained payloads on activity & ha/service/call.
-    `bridge` must expose publish_bytes(topic, payload, qos, retain).
+    `publish` is called as publish(topic, payload_bytes, qos, retain).
     """
     for t in (topics.activity.topic, topics.ha_service_call.topic):
-        bridge.publish_bytes(t, b"", qos=1, retain=True)
+        publish(t, b"", 1, True)
 
 
-def clear_discovery(bridge: Any, topics: "Topics", room: str) -> None:
+def clear_discovery(publish: Callable[[str, bytes, int, bool], Any], topics: "Topics", room: str) -> None:
+    """Clear every retained discovery config; `publish` as in clear_retained_at_start."""
     disc = topics.disc_prefix
     uid = f"{room}_pihub"
     cfgs = [
@@ -49,13 +51,16 @@ def clear_discovery(bridge: Any, topics: "Topics", room: str) -> None:
         f"{disc}/button/{uid}_ble_unpair_all/config",
     ]
     for t in cfgs:
-        bridge.publish_bytes(t, b"", qos=1, retain=True)
+        publish(t, b"", 1, True)
 
 
-def publish_discovery(bridge: Any, topics: "Topics", room: str) -> None:
+def publish_discovery(
+    publish: Callable[[str, bytes, int, bool], Any], topics: "Topics", room: str
+) -> None:
     """
     MQTT Discovery for your full PiHub device with multiple entities, all driven by ONE JSON status topic.
     Names DO NOT include the room; the device name groups them under "<Room Pretty> - PiHub".
+    `publish` is called as publish(topic, payload_bytes, qos, retain).
     """
     disc = topics.disc_prefix
     pretty = _room_pretty(room)
@@ -74,6 +79,8 @@ def publish_discovery(bridge: Any, topics: "Topics", room: str) -> None:
         "payload_available": "online",
         "payload_not_available": "offline",
     }
+    # Shared by every entity fed from the stats JSON; spread into fresh dicts
+    info_base = {"state_topic": state_topic_info, **avail, "device": device}
 
     def pub(kind: str, uid_suffix: str, cfg: dict) -> None:
         # Stable IDs; avoid default_entity_id on buttons
@@ -82,17 +89,15 @@ def publish_discovery(bridge: Any, topics: "Topics", room: str) -> None:
         cfg.setdefault("unique_id", uid)         # always set
         if kind != "button":
             cfg.setdefault("default_entity_id", f"{kind}.{room}_pihub_{uid_suffix}")
-        bridge.publish_json(f"{disc}/{kind}/{uid}/config", cfg, qos=0, retain=True)
+        publish(f"{disc}/{kind}/{uid}/config", _dumps(cfg), 0, True)
 
     # ---- helper for sensors bound to the stats JSON topic ----
     def sensor(uid_suffix: str, name: str, value_tpl: str, extra: dict | None = None):
         cfg = {
+            **info_base,
             "name": name,
             "unique_id": f"{room}_pihub_{uid_suffix}",
-            "state_topic": state_topic_info,
             "value_template": value_tpl,
-            **avail,
-            "device": device,
         }
         if extra:
             cfg.update(extra)
@@ -110,30 +115,26 @@ def publish_discovery(bridge: Any, topics: "Topics", room: str) -> None:
         "device": device,
     })
     pub("binary_sensor", "pi_undervoltage_now", {
+        **info_base,
         "name": "Pi Undervoltage (Now)",
         "unique_id": f"{room}_pihub_pi_undervoltage_now",
         "device_class": "problem",
-        "state_topic": state_topic_info,
         "value_template": "{{ 'ON' if value_json.pi_undervolt | default(false) else 'OFF' }}",
         "payload_on": "ON",
         "payload_off": "OFF",
         "icon": "mdi:alert",
         "entity_category": "diagnostic",
-        **avail,
-        "device": device,
     })
     pub("binary_sensor", "pi_undervoltage_ever", {
+        **info_base,
         "name": "Pi Undervoltage (Ever)",
         "unique_id": f"{room}_pihub_pi_undervoltage_ever",
         "device_class": "problem",
-        "state_topic": state_topic_info,
         "value_template": "{{ 'ON' if value_json.pi_undervolt_ever | default(false) else 'OFF' }}",
         "payload_on": "ON",
         "payload_off": "OFF",
         "icon": "mdi:alert-circle-outline",
         "entity_category": "diagnostic",
-        **avail,
-        "device": device,
     })
 
     # ---- Display-only sensors (direct topics) ----
@@ -212,10 +213,16 @@ def publish_discovery(bridge: Any, topics: "Topics", room: str) -> None:
             # keep discovery going even if one button misbehaves
             pass
 
-def publish_status(bridge: Any, topics: "Topics", *, online: bool, extra: Dict[str, Any] | None = None) -> None:
+def publish_status(
+    publish: Callable[[str, bytes, int, bool], Any],
+    topics: "Topics",
+    *,
+    online: bool,
+    extra: Dict[str, Any] | None = None,
+) -> None:
     """
     Publish combined state + attributes JSON to the status topic (QoS0, non-retained).
-    `bridge` must expose publish_json(topic, payload, qos, retain).
+    `publish` is called as publish(topic, payload_bytes, qos, retain), as in publish_discovery.
     """
     attrs: Dict[str, Any] = {
         "ts": int(time.time()),
@@ -230,4 +237,4 @@ def publish_status(bridge: Any, topics: "Topics", *, online: bool, extra: Dict[s
         "attr": attrs,
     }
     # stats/health snapshots go to /status/info (non-retained, QoS0)
-    bridge.publish_json(topics.status_info.topic, payload, qos=0, retain=False)
\ No newline at end of file
+    publish(topics.status_info.topic, _dumps(payload), 0, False)
\ No newline at end of file
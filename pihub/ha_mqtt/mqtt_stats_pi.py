@@ -1,11 +1,49 @@
 # File: mqtt_stats_pi.py
 from __future__ import annotations
 
+import asyncio
 import os
 import shutil
 import socket
 import subprocess
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, Callable, List
+
+# BlueZ over D-Bus when dbus-fast is available; bluetoothctl otherwise
+try:
+    from dbus_fast import Message, MessageType
+    from pihub.core._sysbus import system_bus
+except ImportError:  # pragma: no cover
+    system_bus = None
+
+
+# Tool paths resolved once at import instead of a PATH walk per status cycle
+_VCGENCMD = shutil.which("vcgencmd")
+_BLUETOOTHCTL = shutil.which("bluetoothctl")
+
+
+# key → (value, monotonic ts); for the fork fallbacks below
+_FORK_TTL_S = 30.0
+_fork_cache: dict[str, tuple[Any, float]] = {}
+
+
+def _cached(key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+    now = time.monotonic()
+    hit = _fork_cache.get(key)
+    if hit is not None and now - hit[1] < ttl:
+        return hit[0]
+    val = fn()
+    _fork_cache[key] = (val, now)
+    return val
+
+
+def _read_raw(path: str, size: int = 4096) -> bytes:
+    # procfs: one os.read, no Python file object (all files here are < 4 KB)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
 
 
 def _read_first(path: str) -> str | None:
@@ -16,23 +54,45 @@ def _read_first(path: str) -> str | None:
         return None
 
 
+# Near-static on a hub: looked up once / refreshed hourly, not every cycle
+_hostname_cache: str | None = None
+_IP_TTL_S = 3600.0
+_ip_cache: tuple[str | None, float] = (None, 0.0)  # (ip, monotonic ts)
+
+
 def _hostname() -> str:
-    try:
-        return socket.gethostname()
-    except Exception:
-        return "unknown"
+    global _hostname_cache
+    if _hostname_cache is None:
+        try:
+            _hostname_cache = socket.gethostname()
+        except Exception:
+            return "unknown"
+    return _hostname_cache
 
 
 def _primary_ip() -> str | None:
+    global _ip_cache
+    ip, ts = _ip_cache
+    now = time.monotonic()
+    if ip is not None and now - ts < _IP_TTL_S:
+        return ip
     # UDP trick: no packets sent, just chooses an outbound interface
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            ip = s.getsockname()[0]
+        _ip_cache = (ip, now)
         return ip
     except Exception:
-        return None
+        return ip  # keep the last known address while the network is down
+
+
+def invalidate_primary_ip() -> None:
+    """Drop the cached IP so the next get_stats() probes again (e.g. after a reconnect)."""
+    global _ip_cache
+    # -inf, not 0.0: monotonic() starts near boot, so 0.0 would still look
+    # fresh for the first hour; keep the IP as the fallback if the probe fails
+    _ip_cache = (_ip_cache[0], float("-inf"))
 
 
 def _cpu_temp_c() -> float | None:
@@ -43,37 +103,65 @@ def _cpu_temp_c() -> float | None:
             return round(val / 1000.0, 1) if val > 1000 else float(val)
         except Exception:
             pass
-    if shutil.which("vcgencmd"):
+    return _cached("temp", _FORK_TTL_S, _cpu_temp_vcgencmd)
+
+
+def _cpu_temp_vcgencmd() -> float | None:
+    if _VCGENCMD:
         try:
-            out = subprocess.check_output(["vcgencmd", "measure_temp"], text=True)
-            # e.g. temp=43.0'C
-            parts = out.strip().replace("'C", "").split("=")
-            if len(parts) == 2:
-                return round(float(parts[1]), 1)
+            out = subprocess.check_output([_VCGENCMD, "measure_temp"])
+            # e.g. b"temp=43.0'C\n"; raw bytes, no decode
+            _, sep, val = out.strip().partition(b"=")
+            if sep:
+                return round(float(val.rstrip(b"'C")), 1)
         except Exception:
             pass
     return None
 
 
-def _load_pct() -> float | None:
-    try:
-        la1 = os.getloadavg()[0]
-        cores = os.cpu_count() or 1
-        pct = (la1 / float(cores)) * 100.0
-        return round(pct, 1)
-    except Exception:
+class CpuSampler:
+    """True CPU utilisation from the /proc/stat delta since this sampler's
+    previous sample (first call: average since boot). Keep one per caller so
+    concurrent collectors don't shorten each other's window."""
+    __slots__ = ("_prev",)
+
+    def __init__(self) -> None:
+        self._prev: tuple[int, int] | None = None  # (busy, total) jiffies
+
+    def sample(self) -> float | None:
+        try:
+            # aggregate "cpu" line is first; 256 bytes covers it
+            fields = _read_raw("/proc/stat", 256).partition(b"\n")[0].split()
+            # cpu user nice system idle iowait irq softirq [steal ...]
+            vals = [int(x) for x in fields[1:8]]
+            idle = vals[3] + vals[4]
+            total = sum(vals)
+            busy = total - idle
+        except Exception:
+            return None
+        prev = self._prev
+        self._prev = (busy, total)
+        if prev is not None:
+            d_total = total - prev[1]
+            if d_total > 0:
+                return round(100.0 * (busy - prev[0]) / d_total, 1)
+        return round(100.0 * busy / total, 1) if total else None
+
+
+def _meminfo_kb(buf: bytes, key: bytes) -> int | None:
+    i = buf.find(key)
+    if i < 0:
         return None
+    return int(buf[i + len(key):].split(None, 1)[0])
 
 
 def _mem_used_pct() -> float | None:
     try:
-        meminfo = {}
-        with open("/proc/meminfo", "r") as f:
-            for line in f:
-                k, v = line.split(":", 1)
-                meminfo[k] = int(v.strip().split()[0])  # kB
-        total = meminfo.get("MemTotal")
-        avail = meminfo.get("MemAvailable")
+        # One read; MemTotal/MemAvailable sit in the first lines, so two
+        # find()s stop early instead of scanning all ~50 (kB)
+        buf = _read_raw("/proc/meminfo")
+        total = _meminfo_kb(buf, b"MemTotal:")
+        avail = _meminfo_kb(buf, b"MemAvailable:")
         if total and avail is not None:
             used = total - avail
             return round(100.0 * used / total, 1)
@@ -82,30 +170,68 @@ def _mem_used_pct() -> float | None:
     return None
 
 
+_DISK_TTL_S = 600.0
+_disk_cache: dict[str, tuple[float, float]] = {}  # path → (pct, monotonic ts)
+
+
 def _disk_used_pct(path: str = "/") -> float | None:
+    # Moves slowly: statvfs at most every 10 min
+    now = time.monotonic()
+    hit = _disk_cache.get(path)
+    if hit and now - hit[1] < _DISK_TTL_S:
+        return hit[0]
     try:
         total, used, free = shutil.disk_usage(path)
-        return round(100.0 * used / total, 1)
+        pct = round(100.0 * used / total, 1)
     except Exception:
-        return None
+        return hit[0] if hit else None
+    _disk_cache[path] = (pct, now)
+    return pct
 
 
 def _uptime_s() -> int | None:
     try:
-        raw = _read_first("/proc/uptime")
-        if raw:
-            return int(float(raw.split()[0]))
+        return int(float(_read_raw("/proc/uptime").partition(b" ")[0]))
     except Exception:
         pass
     return None
 
 
+async def _bt_connected_dbus() -> List[str] | None:
+    # One GetManagedObjects round-trip on the shared system bus; None if
+    # BlueZ/D-Bus is unavailable
+    if system_bus is None:
+        return None
+    try:
+        bus = await system_bus()
+        reply = await bus.call(Message(
+            destination="org.bluez",
+            path="/",
+            interface="org.freedesktop.DBus.ObjectManager",
+            member="GetManagedObjects",
+        ))
+        if reply.message_type != MessageType.METHOD_RETURN:
+            return None
+        macs: List[str] = []
+        for ifaces in reply.body[0].values():
+            dev = ifaces.get("org.bluez.Device1")
+            if not dev:
+                continue
+            conn = dev.get("Connected")
+            addr = dev.get("Address")
+            if conn is not None and conn.value and addr is not None:
+                macs.append(addr.value)
+        return macs
+    except Exception:
+        return None
+
+
 def _bt_connected() -> List[str] | None:
-    # Requires bluetoothctl; returns list of MACs or [] if none
-    if not shutil.which("bluetoothctl"):
+    # Fallback: requires bluetoothctl; returns list of MACs or [] if none
+    if not _BLUETOOTHCTL:
         return None
     try:
-        out = subprocess.check_output(["bluetoothctl", "devices", "Connected"], text=True)
+        out = subprocess.check_output([_BLUETOOTHCTL, "devices", "Connected"], text=True)
         macs: List[str] = []
         for line in out.splitlines():
             parts = line.strip().split()
@@ -116,40 +242,109 @@ def _bt_connected() -> List[str] | None:
         return None
 
 
-def _pi_undervolt_flags() -> tuple[bool | None, bool | None]:
-    # Parse vcgencmd get_throttled (bit0=current UV, bit16=UV has occurred)
-    if not shutil.which("vcgencmd"):
-        return (None, None)
+_THROTTLED_SYSFS = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+
+
+_THROTTLED_OK_TTL_S = 300.0
+_throttled_cache: tuple[int, float] | None = None  # (val, monotonic ts); only caches 0
+
+
+def _throttled_vcgencmd() -> int | None:
+    # Fork fallback; an all-clear reading is reused for a while since
+    # undervoltage is rare, any non-zero value is re-read every cycle
+    global _throttled_cache
+    now = time.monotonic()
+    if _throttled_cache and now - _throttled_cache[1] < _THROTTLED_OK_TTL_S:
+        return _throttled_cache[0]
+    if not _VCGENCMD:
+        return None
     try:
-        out = subprocess.check_output(["vcgencmd", "get_throttled"], text=True)
-        # e.g. throttled=0x50005
-        hexpart = out.strip().split("=", 1)[-1]
-        val = int(hexpart, 16)
-        uv_now = bool(val & 0x1)
-        uv_ever = bool(val & 0x10000)
-        return (uv_now, uv_ever)
+        out = subprocess.check_output([_VCGENCMD, "get_throttled"])
+        # e.g. b"throttled=0x50005\n"
+        val = int(out.strip().rpartition(b"=")[2], 16)
     except Exception:
-        return (None, None)
+        return None
+    _throttled_cache = (val, now) if val == 0 else None
+    return val
+
+
+def _pi_undervolt_flags() -> tuple[bool | None, bool | None]:
+    # get_throttled bits: bit0=current UV, bit16=UV has occurred
+    # Firmware sysfs node first (hex, e.g. "50005"): no fork per status cycle
+    val = None
+    raw = _read_first(_THROTTLED_SYSFS)
+    if raw:
+        try:
+            val = int(raw, 16)
+        except ValueError:
+            val = None
+    if val is None:
+        val = _throttled_vcgencmd()
+        if val is None:
+            return (None, None)
+    uv_now = bool(val & 0x1)
+    uv_ever = bool(val & 0x10000)
+    return (uv_now, uv_ever)
+
+
+def _collect_sync(cpu: CpuSampler) -> tuple:
+    return (
+        _hostname(),
+        _primary_ip(),
+        _uptime_s(),
+        cpu.sample(),
+        _cpu_temp_c(),
+        _disk_used_pct("/"),
+        _mem_used_pct(),
+        _pi_undervolt_flags(),
+    )
+
+
+# Fields behind HA sensors: a missing key would hit the templates' default(0)
+# and chart a fake 0 °C / 0 %, while null renders as unknown. Only the
+# undervolt flags (binary sensors, null and missing both read OFF) are dropped.
+_KEEP_NULL = frozenset({
+    "host", "ip_addr", "uptime_s", "bt_connected_count",
+    "cpu_load_pct", "cpu_temp_c", "disk_used_pct", "mem_used_pct",
+})
 
 
-def get_stats() -> Dict[str, Any]:
+async def get_stats(
+    out: Dict[str, Any] | None = None, cpu: CpuSampler | None = None
+) -> Dict[str, Any]:
     """Return a dict of Pi stats to embed in status JSON under `attr`.
-    Safe on non-Pi Linux; fields are None if not available.
+    Safe on non-Pi Linux; unavailable sensor fields are null, other
+    unavailable fields are omitted. Must run on the app loop (the
+    BlueZ bus is bound to it). Pass `out` to update a long-lived dict in
+    place instead of building a new one, and `cpu` to get load over the
+    interval since your previous call (otherwise: average since boot).
     """
-    bt = _bt_connected()
-    uv_now, uv_ever = _pi_undervolt_flags()
-    return {
-        "host": _hostname(),
-        "ip_addr": _primary_ip(),
-        "uptime_s": _uptime_s(),
-        "last_activity_cmd": None,     # filled by runner if desired
-        "last_ha_service": None,       # filled by runner if desired
-        "bt_connected_count": (len(bt) if bt is not None else None),
-        "bt_connected_macs": (", ".join(bt) if bt else "-"),
-        "cpu_load_pct": _load_pct(),
-        "cpu_temp_c": _cpu_temp_c(),
-        "disk_used_pct": _disk_used_pct("/"),
-        "mem_used_pct": _mem_used_pct(),
-        "pi_undervolt": uv_now,
-        "pi_undervolt_ever": uv_ever,
-    }
+    # D-Bus round-trip and the file/fork collectors overlap; the latter run
+    # in a worker thread so a cache-miss fork never stalls key dispatch
+    bt, (host, ip, uptime, load, temp, disk, mem, (uv_now, uv_ever)) = await asyncio.gather(
+        _bt_connected_dbus(), asyncio.to_thread(_collect_sync, cpu or CpuSampler())
+    )
+    if bt is None:
+        bt = await asyncio.to_thread(_cached, "bt", _FORK_TTL_S, _bt_connected)
+    if out is None:
+        out = {}
+    for k, v in (
+        ("host", host),
+        ("ip_addr", ip),
+        ("uptime_s", uptime),
+        ("bt_connected_count", (len(bt) if bt is not None else None)),
+        ("bt_connected_macs", (", ".join(bt) if bt else "-")),
+        ("cpu_load_pct", load),
+        ("cpu_temp_c", temp),
+        ("disk_used_pct", disk),
+        ("mem_used_pct", mem),
+        ("pi_undervolt", uv_now),
+        ("pi_undervolt_ever", uv_ever),
+    ):
+        # Same keys every cycle: overwrite in place. Sensor-backed fields keep
+        # an explicit null (HA: unknown); elsewhere a missing value is dropped
+        if v is None and k not in _KEEP_NULL:
+            out.pop(k, None)
+        else:
+            out[k] = v
+    return out
@@ -1,10 +1,11 @@
 # File: mqtt_topics.py
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TopicPolicy:
     topic: str
     direction: str  # "tx" | "rx"
@@ -13,7 +14,7 @@ class TopicPolicy:
     desc: str = ""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Topics:
     # RX
     activity_state: TopicPolicy    # pihub/input_select/<room>_activity/state (retained by HA, QoS1)
@@ -32,41 +33,42 @@ class Topics:
 
 
 def build_topics(prefix_bridge: str, room: str, disc_prefix: str = "homeassistant") -> Topics:
+    # Topics are interned: built once, then used as dict keys / compared on every message
     base = f"{prefix_bridge}"
 
     return Topics(
         # RX
         activity_state=TopicPolicy(
-            topic=f"pihub/input_select/{room}_activity/state",
+            topic=sys.intern(f"pihub/input_select/{room}_activity/state"),
             direction="rx", qos=1, retain=True,
             desc="Current activity from HA statestream (retained @ broker)",
         ),
         cmd_all=TopicPolicy(
-            topic=f"pihub/{room}/cmd", 
+            topic=sys.intern(f"pihub/{room}/cmd"), 
             direction="rx", qos=1, retain=False,
             desc="Unified command bus. Payload 'category:action' (e.g. 'macro:atv-on').",
         ),
 
         # TX
         activity=TopicPolicy(
-            topic=f"{base}/activity",
+            topic=sys.intern(f"{base}/activity"),
             direction="tx", qos=1, retain=False,
             desc="App's current mapping/activity. Never retained; nuked at start.",
         ),
         ha_service_call=TopicPolicy(
-            topic=f"{base}/ha/service/call",
+            topic=sys.intern(f"{base}/ha/service/call"),
             direction="tx", qos=1, retain=False,
             desc="One-shot HA service call requests. Never retained; nuked at start.",
         ),
 
         # TX (status split)
         status=TopicPolicy(
-            topic=f"{base}/status",
+            topic=sys.intern(f"{base}/status"),
             direction="tx", qos=1, retain=True,
             desc='Availability only: plain "online"/"offline". Retained for instant HA availability.',
         ),
         status_info=TopicPolicy(
-            topic=f"{base}/status/info",
+            topic=sys.intern(f"{base}/status/info"),
             direction="tx", qos=0, retain=False,
             desc="Stats/health snapshot JSON (ephemeral, non-retained).",
         ),
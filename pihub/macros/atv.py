@@ -1,5 +1,4 @@
 # pihub/macros/atv.py
-import asyncio
 
 # Consumer usages (HID Usage Page 0x0C)
 U_STOP      = 0x00B7
@@ -8,23 +7,19 @@ U_AC_HOME   = 0x0223
 U_POWER     = 0x0030
 
 DEFAULT_IKD_MS = 400  # inter-key delay
+WAKE_MS = 3000        # atv-on: power → menu, gives the ATV time to wake
 
 async def atv_off(hid, ikd_ms: int = DEFAULT_IKD_MS):
     """OFF sequence:
-       stop → ac_home → ac_home → menu → menu → power(3s)"""
-    d = ikd_ms / 1000.0
-    await hid.consumer_tap(U_STOP,    hold_ms=40); await asyncio.sleep(d)
-    await hid.consumer_tap(U_AC_HOME, hold_ms=40); await asyncio.sleep(d)
-    await hid.consumer_tap(U_AC_HOME, hold_ms=40); await asyncio.sleep(d)
-    await hid.consumer_tap(U_MENU,    hold_ms=40); await asyncio.sleep(d)
-    await hid.consumer_tap(U_MENU,    hold_ms=40); await asyncio.sleep(d)
-    await hid.consumer_tap(U_POWER,   hold_ms=2000)
+       stop → ac_home → ac_home → menu → menu → power(2s)"""
+    await hid.consumer_sequence(
+        [(U_STOP, 40), (U_AC_HOME, 40), (U_AC_HOME, 40), (U_MENU, 40), (U_MENU, 40), (U_POWER, 2000)],
+        ikd_ms=ikd_ms,
+    )
     print("[macros] atv-off done")
 
-async def atv_on(hid, ikd_ms: int = DEFAULT_IKD_MS):
+async def atv_on(hid):
     """ON sequence:
        power → wait 3s → menu"""
-    await hid.consumer_tap(U_POWER, hold_ms=40)
-    await asyncio.sleep(3.0)
-    await hid.consumer_tap(U_MENU, hold_ms=40)
-    print("[macros] atv-on done")
\ No newline at end of file
+    await hid.consumer_sequence([(U_POWER, 40), (U_MENU, 40)], ikd_ms=WAKE_MS)
+    print("[macros] atv-on done")
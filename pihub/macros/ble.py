@@ -3,73 +3,95 @@ from __future__ import annotations
 import asyncio
 from typing import List
 
-from dbus_fast.aio import MessageBus
-from dbus_fast import BusType
+from dbus_fast.introspection import Node
+
+from pihub.core._sysbus import system_bus
 
 BLUEZ_SERVICE = "org.bluez"
 OBJ_MANAGER = "org.freedesktop.DBus.ObjectManager"
 ADAPTER_IFACE = "org.bluez.Adapter1"
 DEVICE_IFACE = "org.bluez.Device1"
 
+# Static introspection for just the members used here; BlueZ's API is stable,
+# so there's no need for an Introspect round-trip per object
+_ROOT_NODE = Node.parse("""<node>
+  <interface name="org.freedesktop.DBus.ObjectManager">
+    <method name="GetManagedObjects">
+      <arg name="objects" type="a{oa{sa{sv}}}" direction="out"/>
+    </method>
+  </interface>
+</node>""")
+_ADAPTER_NODE = Node.parse("""<node>
+  <interface name="org.bluez.Adapter1">
+    <method name="RemoveDevice">
+      <arg name="device" type="o" direction="in"/>
+    </method>
+  </interface>
+</node>""")
+_DEVICE_NODE = Node.parse("""<node>
+  <interface name="org.bluez.Device1">
+    <method name="Disconnect"/>
+  </interface>
+</node>""")
+
 async def unpair_all(adapter: str = "hci0") -> None:
     """
     Remove all bonded devices under /org/bluez/<adapter>/dev_* using BlueZ Adapter1.RemoveDevice.
     Only removes actual Device1 nodes (not their GATT children).
     """
-    bus = await MessageBus(bus_type=BusType.SYSTEM).connect()
-    try:
-        # ObjectManager on "/"
-        root_introspect = await bus.introspect(BLUEZ_SERVICE, "/")
-        root_proxy = bus.get_proxy_object(BLUEZ_SERVICE, "/", root_introspect)
-        om = root_proxy.get_interface(OBJ_MANAGER)
-
-        # dbus-fast: call_get_managed_objects()
-        objects = await om.call_get_managed_objects()
-
-        # Gather ONLY Device1 nodes for this adapter (skip service/char/desc children)
-        prefix = f"/org/bluez/{adapter}/dev_"
-        dev_paths: List[str] = [
-            path for path, ifaces in objects.items()
-            if path.startswith(prefix) and DEVICE_IFACE in ifaces
-        ]
-
-        if not dev_paths:
-            print("[macros] no paired bluetooth devices found")
-            return
-
-        # Prepare adapter proxy once
-        adapter_path = f"/org/bluez/{adapter}"
-        adp_intro = await bus.introspect(BLUEZ_SERVICE, adapter_path)
-        adp_proxy = bus.get_proxy_object(BLUEZ_SERVICE, adapter_path, adp_intro)
-        adapter_if = adp_proxy.get_interface(ADAPTER_IFACE)
-
-        removed = 0
-        for path in dev_paths:
+    bus = await system_bus()  # shared connection: never disconnect it here
+
+    # ObjectManager on "/"
+    root_proxy = bus.get_proxy_object(BLUEZ_SERVICE, "/", _ROOT_NODE)
+    om = root_proxy.get_interface(OBJ_MANAGER)
+
+    # dbus-fast: call_get_managed_objects()
+    objects = await om.call_get_managed_objects()
+
+    # Gather ONLY Device1 nodes for this adapter (skip service/char/desc children)
+    prefix = f"/org/bluez/{adapter}/dev_"
+    dev_paths: List[str] = [
+        path for path, ifaces in objects.items()
+        if path.startswith(prefix) and DEVICE_IFACE in ifaces
+    ]
+
+    if not dev_paths:
+        print("[macros] no paired bluetooth devices found")
+        return
+
+    # Prepare adapter proxy once
+    adapter_path = f"/org/bluez/{adapter}"
+    adp_proxy = bus.get_proxy_object(BLUEZ_SERVICE, adapter_path, _ADAPTER_NODE)
+    adapter_if = adp_proxy.get_interface(ADAPTER_IFACE)
+
+    async def _remove(path: str) -> None:
+        # If still connected, request a disconnect first to speed things up;
+        # GetManagedObjects already returned every Device1 property
+        conn = objects[path][DEVICE_IFACE].get("Connected")
+        if conn is not None and conn.value:
             try:
-                # If still connected, request a disconnect first to speed things up
-                dev_intro = await bus.introspect(BLUEZ_SERVICE, path)
-                dev_proxy = bus.get_proxy_object(BLUEZ_SERVICE, path, dev_intro)
-                dev = dev_proxy.get_interface(DEVICE_IFACE)
-                try:
-                    props = await dev_proxy.get_interface("org.freedesktop.DBus.Properties").call_get_all(DEVICE_IFACE)
-                    if bool(props.get("Connected", False)):
-                        with asyncio.timeout(2.0):
-                            await dev.call_disconnect()
-                except Exception:
-                    pass  # best effort
-
-                # Remove the device (this clears the bond and will trigger disconnect if still up)
-                await adapter_if.call_remove_device(path)
-                print(f"[macros] removed paired bluetooth device {path}")
-                removed += 1
-            except Exception as e:
-                print(f"[macros] failed to remove bluetooth device {path}: {e}")
-
-        if removed == 0:
-            print("[macros] no bluetooth devices removed (errors above)")
-    finally:
-        # dbus-fast disconnect() is synchronous
-        bus.disconnect()
+                dev_proxy = bus.get_proxy_object(BLUEZ_SERVICE, path, _DEVICE_NODE)
+                async with asyncio.timeout(2.0):
+                    await dev_proxy.get_interface(DEVICE_IFACE).call_disconnect()
+            except Exception:
+                pass  # best effort
+
+        # Remove the device (this clears the bond and will trigger disconnect if still up)
+        await adapter_if.call_remove_device(path)
+
+    # Devices are independent: one round of bluetoothd calls, not N in a row
+    results = await asyncio.gather(*(_remove(p) for p in dev_paths), return_exceptions=True)
+
+    removed = 0
+    for path, res in zip(dev_paths, results):
+        if isinstance(res, BaseException):
+            print(f"[macros] failed to remove bluetooth device {path}: {res}")
+        else:
+            print(f"[macros] removed paired bluetooth device {path}")
+            removed += 1
+
+    if removed == 0:
+        print("[macros] no bluetooth devices removed (errors above)")
 
 if __name__ == "__main__":
     asyncio.run(unpair_all("hci0"))
\ No newline at end of file
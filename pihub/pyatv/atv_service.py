@@ -6,7 +6,7 @@ import contextlib
 import inspect
 import logging
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
 from pyatv import scan, connect, exceptions as atv_exceptions
 from pyatv.const import Protocol, DeviceState
@@ -44,36 +44,46 @@ _KEYVAL = {
 }
 
 # Buttons that accept InputAction (tap/double/hold)
-_ACTION_KEYS = {"up", "down", "left", "right", "select", "menu", "home"}
+_ACTION_KEYS = frozenset({"up", "down", "left", "right", "select", "menu", "home"})
 # Transport-like methods: tap-only (no action=)
-_TAP_ONLY_KEYS = {
+_TAP_ONLY_KEYS = frozenset({
     "play", "pause", "play_pause", "stop",
     "next", "previous",
     "skip_forward", "skip_backward", "channel_up", "channel_down",
-}
+})
 _ALLOWED = _ACTION_KEYS | _TAP_ONLY_KEYS
+# canonical names map to themselves, so the usual call is one dict hit
+_ALIAS = {k: k for k in _ALLOWED}
 
 
 # ---------- helper (CHUNK B): put at module level, above the class ----------
+# (type(rc), name) → True if the method takes the key argument
+_ARITY_CACHE: dict[tuple[type, str], bool] = {}
+
+
+def _takes_arg(fn) -> bool:
+    # Bound method (no 'self'); count required positional-only/positional-or-keyword params
+    sig = inspect.signature(fn)
+    required = [
+        p for p in sig.parameters.values()
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) and p.default is p.empty
+    ]
+    return len(required) >= 1
+
+
 async def _call_method(rc, name: str, val=None) -> None:
     """Call rc.<name>([val]) and adapt to builds where release() takes no arg.
-    Why: some pyatv versions have release(), others release(key)."""
+    Why: some pyatv versions have release(), others release(key).
+    The signature check runs once per (remote class, method)."""
     fn = getattr(rc, name, None)
     if not callable(fn):
         return
     try:
-        sig = inspect.signature(fn)
-        # Bound method (no 'self'); count required positional-only/positional-or-keyword params
-        required = [
-            p for p in sig.parameters.values()
-            if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) and p.default is p.empty
-        ]
-        if len(required) == 0:
-            res = fn()
-        elif len(required) >= 1 and val is not None:
-            res = fn(val)
-        else:
-            res = fn()
+        key = (type(rc), name)
+        takes_arg = _ARITY_CACHE.get(key)
+        if takes_arg is None:
+            takes_arg = _ARITY_CACHE[key] = _takes_arg(fn)
+        res = fn(val) if (takes_arg and val is not None) else fn()
         if asyncio.iscoroutine(res):
             await res
     except TypeError:
@@ -84,7 +94,7 @@ async def _call_method(rc, name: str, val=None) -> None:
 # ---------------------------------------------------------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PyAtvCreds:
     address: str
     companion: str
@@ -119,7 +129,10 @@ class _PihubPushListener(PushListener):
 
 
 class AppleTvService:
-    """Lean pyatv remote service: InputAction gestures + press/release for scrub."""
+    """Lean pyatv remote service: InputAction gestures + press/release for scrub.
+    on_state receives deltas: only the keys that changed since the last call.
+    The merged view resets on every disconnect, so each (re)connect starts
+    from a full picture again."""
 
     def __init__(
         self,
@@ -140,6 +153,12 @@ class AppleTvService:
         self._device_state: DeviceState | None = None
         self._listener = _PihubPushListener(self)
 
+        # name → bound remote_control method for the current connection
+        self._rc_methods: dict[str, Callable] = {}
+
+        # merged view of everything emitted so far; _emit only sends the delta
+        self._last_state: dict = {}
+
     # ── lifecycle ──────────────────────────────────────────────────────────
     async def start(self) -> None:
         if self._task and not self._task.done():
@@ -200,10 +219,9 @@ class AppleTvService:
     def _norm(self, key: str | None) -> str | None:
         if not key:
             return None
-        k = key.strip().lower()
-        if k not in _ALLOWED:
+        k = _ALIAS.get(key) or _ALIAS.get(key.strip().lower())
+        if k is None:
             _LOG.warning("[pyatv] unsupported key: %r", key)
-            return None
         return k
 
     async def _run(self) -> None:
@@ -236,7 +254,7 @@ class AppleTvService:
         # Prefer a config that includes Companion
         chosen = None
         for c in configs:
-            protos = [s.protocol for s in c.services]
+            protos = {s.protocol for s in c.services}
             _LOG.info("ATV services at %s: %s", self._creds.address, protos)
             if Protocol.Companion in protos:
                 chosen = c
@@ -262,7 +280,12 @@ class AppleTvService:
         except Exception as e:
             _LOG.info("push_updater unavailable: %s", e)
 
-        _ = self._atv.remote_control  # probe
+        # Bind every supported key once per connection; _send just looks it up
+        rc = self._atv.remote_control
+        for name in _ALLOWED:
+            method = getattr(rc, name, None)
+            if callable(method):
+                self._rc_methods[name] = method
 
     async def _disconnect(self) -> None:
         if self._atv:
@@ -274,6 +297,8 @@ class AppleTvService:
             with contextlib.suppress(Exception):
                 await self._atv.close()
         self._atv = None
+        self._rc_methods.clear()
+        self._last_state.clear()
         self._connected_evt.clear()
         self._device_state = None
 
@@ -289,34 +314,31 @@ class AppleTvService:
     async def _send(self, name: str, action: str) -> None:
         """Dispatch a gesture to pyatv. Transport keys are tap-only."""
         try:
-            atv = await self._ensure()
-            rc = atv.remote_control
-            method = getattr(rc, name, None)
-            if not callable(method):
-                _LOG.warning("[pyatv] method %s() not found", name)
-                return
+            method = self._rc_methods.get(name)
+            if method is None:
+                atv = await self._ensure()
+                method = getattr(atv.remote_control, name, None)
+                if not callable(method):
+                    _LOG.warning("[pyatv] method %s() not found", name)
+                    return
+                self._rc_methods[name] = method
     
+            # remote_control methods are coroutines on every supported build
             # Transport: no action= supported (next/previous/stop/skip_* etc.)
             if name in _TAP_ONLY_KEYS or not HAS_INPUT_ACTION:
-                res = method()
-                if asyncio.iscoroutine(res):
-                    await res
+                await method()
                 return
     
             # Gesture-capable keys (up/down/left/right/select/menu/home)
             if action == "tap":
                 # IMPORTANT: call without action kwarg for SingleTap on 0.16.1
-                res = method()
+                await method()
             elif action == "double":
-                res = method(action=InputAction.DoubleTap)
+                await method(action=InputAction.DoubleTap)
             elif action == "hold":
-                res = method(action=InputAction.Hold)
+                await method(action=InputAction.Hold)
             else:
                 _LOG.warning("[pyatv] unknown action=%s for %s", action, name)
-                return
-    
-            if asyncio.iscoroutine(res):
-                await res
     
         except atv_exceptions.AuthenticationError:
             _LOG.error("[pyatv] authentication error (bad credentials)")
@@ -333,8 +355,13 @@ class AppleTvService:
             _LOG.error("[pyatv] send(%s, action=%s) failed: %s", name, action, e)
 
     def _emit(self, state: dict) -> None:
+        last = self._last_state
+        delta = {k: v for k, v in state.items() if k not in last or last[k] != v}
+        if not delta:
+            return
+        last.update(delta)
         if self._on_state:
             try:
-                self._on_state(state)
+                self._on_state(delta)
             except Exception:
                 _LOG.exception("[pyatv] on_state callback error")
\ No newline at end of file
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
-import time, json, sys
+import time, json, sys, threading, socket, contextlib
+from dataclasses import dataclass, field
 from paho.mqtt import client as mqtt
 
 HOST = "192.168.70.24"
@@ -7,32 +8,62 @@ PORT = 1883
 USER = "remote"
 PASS = "remote"
 TOPIC = "pihub/living_room/cmd/#"
+QUIET_S = 0.3      # retained burst is over once nothing arrives for this long
+MAX_WAIT_S = 10.0  # hard cap on the collection window
 
-seen = set()
+@dataclass
+class Scan:
+    """Collection state, handed to the paho callbacks as userdata."""
+    seen: set = field(default_factory=set)
+    subscribed: threading.Event = field(default_factory=threading.Event)
+    last_msg: float = 0.0  # monotonic ts of the last SUBACK/message
 
 def on_connect(c, u, f, rc, props=None):
+    # Clears are tiny QoS0 publishes: send them now, don't wait out Nagle
+    with contextlib.suppress(OSError, AttributeError):
+        c.socket().setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     c.subscribe(TOPIC)
 
-def on_message(c, u, msg):
-    seen.add(msg.topic)
+def on_subscribe(c, scan, mid, rc_list, props=None):
+    # Broker sends retained messages right after SUBACK
+    scan.last_msg = time.monotonic()
+    scan.subscribed.set()
+
+def on_message(c, scan, msg):
+    # interned so repeat topics hash/compare cheaply
+    scan.seen.add(sys.intern(msg.topic))
+    scan.last_msg = time.monotonic()
 
 def main():
     c = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    scan = Scan()
+    c.user_data_set(scan)
     c.username_pw_set(USER, PASS)
     c.on_connect = on_connect
+    c.on_subscribe = on_subscribe
     c.on_message = on_message
     c.connect(HOST, PORT, 60)
     c.loop_start()
-    time.sleep(3.0)  # wait a moment to collect retained messages
-    c.loop_stop()
-    if not seen:
+    # Collect retained messages until they stop arriving (or MAX_WAIT_S)
+    deadline = time.monotonic() + MAX_WAIT_S
+    while time.monotonic() < deadline:
+        if scan.subscribed.is_set() and time.monotonic() - scan.last_msg >= QUIET_S:
+            break
+        time.sleep(0.05)
+    topics = sorted(scan.seen)
+    if not topics:
+        c.loop_stop()
         print("No retained cmd topics found.")
         return
-    print(f"Clearing {len(seen)} topics…")
-    for t in sorted(seen):
-        c.publish(t, payload=None, retain=True)  # retained null clears
+    print(f"Clearing {len(topics)} topics…")
+    # Queue every clear first so the network thread writes them back to back,
+    # then wait for all of them once
+    infos = [c.publish(t, payload=None, retain=True) for t in topics]  # retained null clears
+    for t, info in zip(topics, infos):
+        info.wait_for_publish(5.0)
         print("cleared:", t)
     c.disconnect()
+    c.loop_stop()
 
 if __name__ == "__main__":
     main()